@@ -1,9 +1,10 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context
 import requests
 from flask_cors import CORS
 import os
 import random
 import base64
+import re
 import json
 from datetime import datetime
 from PIL import Image
@@ -12,7 +13,8 @@ from google.generativeai.types import Tool
 from google.generativeai import types
 from google import genai
 from google.genai import types
-from supabase_client import insert_report
+from supabase_client import insert_report, query_reports
+from text_index import TextIndex
 import io
 from send_reports import fetch_and_send_reports
 
@@ -41,6 +43,33 @@ explanation_detailed = ""
 MY_API_KEY = os.getenv("MY_API_KEY")
 MY_SEARCH_ENGINE_ID = os.getenv("MY_SEARCH_ENGINE_ID")
 
+# Page size used when streaming reports out of Supabase
+REPORTS_BATCH_SIZE = 500
+REPORTS_MAX_LIMIT = 1000
+REPORT_ID_PATTERN = re.compile(r"RPT-[0-9A-F]{8}")
+
+def int_from_env(name, default, minimum, maximum):
+    """Read an integer setting from the environment, falling back to default if invalid"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or not minimum <= number <= maximum:
+        print(f"Warning: {name} must be an integer between {minimum} and {maximum}, using {default}")
+        return default
+    return number
+
+# Index of previously verified texts, used to reuse verdicts for scam templates
+# that only differ in names, tracking links, phone numbers or amounts.
+# It lives in process memory, so each serverless instance starts empty.
+text_index = TextIndex(
+    max_distance=int_from_env("TEXT_MATCH_MAX_DISTANCE", 3, 0, 63),
+    capacity=int_from_env("TEXT_MATCH_CAPACITY", 50000, 1, 10000000)
+)
+
 @app.route('/')
 def index():
     """Serve the main application page"""
@@ -146,6 +175,79 @@ def submit_report():
         app.logger.error(f"Error in submit_report: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/reports', methods=['GET'])
+def list_reports():
+    """
+    Query submitted scam reports as streamed NDJSON, newest first
+    
+    Query parameters (all optional):
+        scam_type, platform, domain  - exact filters
+        since, until                 - ISO timestamps, since inclusive / until exclusive
+        q                            - full-text search over description
+        limit                        - max reports to return (default 100, at most 1000)
+        cursor                       - next_cursor from a previous response
+    
+    Each line is one report. The last line is {"next_cursor": "..."}, with
+    null once there are no more reports.
+    """
+    auth_header = request.headers.get('Authorization')
+    expected_token = f"Bearer {os.getenv('REPORTS_API_SECRET')}"
+
+    if not os.getenv('REPORTS_API_SECRET') or auth_header != expected_token:
+        print("Unauthorized attempt to access /api/reports")
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    filters = {key: request.args.get(key, '').strip() for key in ['scam_type', 'platform', 'domain', 'since', 'until', 'q']}
+    for field in ['since', 'until']:
+        if filters[field]:
+            try:
+                datetime.fromisoformat(filters[field])
+            except ValueError:
+                return jsonify({'error': f'Invalid ISO timestamp: {field}'}), 400
+
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not 1 <= limit <= REPORTS_MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {REPORTS_MAX_LIMIT}'}), 400
+
+    after = None
+    if request.args.get('cursor'):
+        try:
+            after = decode_cursor(request.args['cursor'])
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    # Fetch the first batch up front so a failing query returns a proper error status
+    batch_size = min(REPORTS_BATCH_SIZE, limit)
+    first_batch = query_reports(filters, after=after, limit=batch_size)
+    if first_batch is None:
+        return jsonify({'error': 'Failed to fetch reports'}), 500
+
+    def generate():
+        nonlocal after
+        reports, size, remaining = first_batch, batch_size, limit
+        while True:
+            for r in reports:
+                yield json.dumps(r) + "\n"
+            if reports:
+                after = (reports[-1]['timestamp'], reports[-1]['id'])
+            remaining -= len(reports)
+            if len(reports) < size:
+                yield json.dumps({'next_cursor': None}) + "\n"
+                return
+            if remaining == 0:
+                yield json.dumps({'next_cursor': encode_cursor(after)}) + "\n"
+                return
+            size = min(REPORTS_BATCH_SIZE, remaining)
+            reports = query_reports(filters, after=after, limit=size)
+            if reports is None:
+                yield json.dumps({'error': 'Failed to fetch reports'}) + "\n"
+                return
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 def analyze_content(content_type, content_data):
     """
     Analyze content for potential scams
@@ -188,6 +290,18 @@ def analyze_text(text_content):
     #defining global varaible
     global explanation_detailed
     
+    # Reuse the verdict of a previously verified message from the same template
+    match = text_index.lookup(text_content)
+    if match:
+        result = match.result
+        result["template_match"] = {
+            "distance": match.distance,
+            "similarity": round(match.similarity, 3)
+        }
+        print(f"Template match found (distance {match.distance}), skipping Gemini call")
+        explanation_detailed = match.detailed_explanation
+        return result
+    
     # Scam verification prompt
     prompt = f"""
     You are a sophisticated scam identification AI designed to provide structured JSON output. 
@@ -264,6 +378,7 @@ def analyze_text(text_content):
     result["reference_urls"]=reference_url
     print(result,"\n\n")
     explanation_detailed = detailed_part.strip(" ")
+    text_index.add(text_content, result, explanation_detailed)
         
 
     return result
@@ -420,6 +535,23 @@ def generate_report_id():
     import uuid
     return f"RPT-{uuid.uuid4().hex[:8].upper()}"
 
+def encode_cursor(key):
+    """Encode a (timestamp, id) keyset position as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        timestamp, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        # Both values end up inside a PostgREST filter string, so only accept
+        # a real ISO timestamp and an id in the generate_report_id format
+        datetime.fromisoformat(timestamp)
+        if not REPORT_ID_PATTERN.fullmatch(report_id):
+            raise ValueError("Invalid report id")
+        return timestamp, report_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 @app.errorhandler(413)
 def too_large(e):
     return jsonify({'error': 'File too large'}), 413
@@ -0,0 +1,29 @@
+-- Indexes backing the /api/reports query API and the daily digest.
+-- Every listing is ordered by (timestamp, id) so keyset pagination can walk
+-- the index instead of sorting the whole table.
+-- content_domain must stay in sync with normalize_domain in supabase_client.py.
+
+alter table scam_reports
+    add column if not exists content_domain text
+        generated always as (
+            substring(lower(content_url) from '^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?([^/:?#@]+)')
+        ) stored;
+
+alter table scam_reports
+    add column if not exists description_tsv tsvector
+        generated always as (to_tsvector('english', coalesce(description, ''))) stored;
+
+create index if not exists scam_reports_timestamp_id_idx
+    on scam_reports (timestamp desc, id desc);
+
+create index if not exists scam_reports_scam_type_timestamp_idx
+    on scam_reports (scam_type, timestamp desc, id desc);
+
+create index if not exists scam_reports_platform_timestamp_idx
+    on scam_reports (platform, timestamp desc, id desc);
+
+create index if not exists scam_reports_domain_timestamp_idx
+    on scam_reports (content_domain, timestamp desc, id desc);
+
+create index if not exists scam_reports_description_tsv_idx
+    on scam_reports using gin (description_tsv);
@@ -1,5 +1,6 @@
 from supabase import create_client, Client
 import os
+import re
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,3 +21,49 @@ def insert_report(report_data: dict):
     except Exception as e:
         print("Error inserting report:", e)
         return None
+
+# Columns returned by query_reports. Leaves out contact_email and the generated
+# search columns.
+REPORT_COLUMNS = "id, scam_type, platform, content_url, description, additional_info, timestamp, status"
+
+def normalize_domain(value: str):
+    """Reduce a domain or URL to the form stored in the content_domain column"""
+    match = re.match(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?([^/:?#@]+)", value.strip().lower())
+    return match.group(1) if match else ""
+
+def build_reports_query(filters: dict, after: tuple = None, limit: int = 100):
+    """
+    Build the query for one page of reports, newest first.
+
+    filters may contain scam_type, platform, domain, since, until and q
+    (full-text search over description). after is the (timestamp, id) key of
+    the last row of the previous page. Relies on the indexes and generated
+    columns in supabase/migrations.
+    """
+    query = supabase.table("scam_reports").select(REPORT_COLUMNS)
+    if filters.get("scam_type"):
+        query = query.eq("scam_type", filters["scam_type"])
+    if filters.get("platform"):
+        query = query.eq("platform", filters["platform"])
+    if filters.get("domain"):
+        query = query.eq("content_domain", normalize_domain(filters["domain"]))
+    if filters.get("since"):
+        query = query.gte("timestamp", filters["since"])
+    if filters.get("until"):
+        query = query.lt("timestamp", filters["until"])
+    if filters.get("q"):
+        # text_search() ends the builder chain, so use the raw websearch filter
+        query = query.filter("description_tsv", "wfts(english)", filters["q"])
+    if after:
+        last_ts, last_id = after
+        query = query.or_(f'timestamp.lt."{last_ts}",and(timestamp.eq."{last_ts}",id.lt."{last_id}")')
+    return query.order("timestamp", desc=True).order("id", desc=True).limit(limit)
+
+def query_reports(filters: dict, after: tuple = None, limit: int = 100):
+    """Fetch one page of reports as built by build_reports_query"""
+    try:
+        response = build_reports_query(filters, after=after, limit=limit).execute()
+        return response.data
+    except Exception as e:
+        print("Error querying reports:", e)
+        return None
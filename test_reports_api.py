@@ -0,0 +1,134 @@
+import os
+import json
+from urllib.parse import unquote
+
+import pytest
+
+# supabase_client and app read these at import time
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+os.environ.setdefault("MY_API_KEY", "test-key")
+
+import app as satya
+from supabase_client import build_reports_query, normalize_domain
+
+SECRET = "test-secret"
+REPORTS = sorted(
+    [{"id": f"RPT-{i:08X}", "timestamp": f"2026-10-{1 + i // 3:02d}T00:00:00", "description": f"report {i}"} for i in range(30)],
+    key=lambda r: (r["timestamp"], r["id"]),
+    reverse=True
+)
+
+
+def fake_query_reports(filters, after=None, limit=100):
+    rows = [r for r in REPORTS if after is None or (r["timestamp"], r["id"]) < after]
+    return rows[:limit]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("REPORTS_API_SECRET", SECRET)
+    monkeypatch.setattr(satya, "query_reports", fake_query_reports)
+    monkeypatch.setattr(satya, "REPORTS_BATCH_SIZE", 4)
+    return satya.app.test_client()
+
+
+def get_reports(client, **params):
+    return client.get("/api/reports", query_string=params, headers={"Authorization": f"Bearer {SECRET}"})
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_cursor_round_trip():
+    key = ("2026-10-19T10:00:00.123+00:00", "RPT-ABCD1234")
+    assert satya.decode_cursor(satya.encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("key", [
+    ('2026-10-19",id.gt."x', "RPT-ABCD1234"),
+    ("2026-10-19T10:00:00", "RPT-x),(y"),
+    ("2026-10-19T10:00:00", 12345678),
+])
+def test_decode_cursor_rejects_unsafe_values(key):
+    with pytest.raises(ValueError):
+        satya.decode_cursor(satya.encode_cursor(key))
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        satya.decode_cursor("not-a-cursor")
+
+
+@pytest.mark.parametrize("value", ["example.com", "Example.COM", "www.example.com", "https://example.com/path", "HTTPS://WWW.example.com:443"])
+def test_normalize_domain(value):
+    assert normalize_domain(value) == "example.com"
+
+
+def test_query_builder_chains_search_with_cursor():
+    query = build_reports_query({"q": "bank otp", "domain": "www.example.com"}, after=("2026-10-19T10:00:00", "RPT-ABCD1234"), limit=5)
+    params = unquote(str(query.params))
+    assert "content_domain=eq.example.com" in params
+    assert "description_tsv=wfts(english).bank+otp" in params
+    assert 'or=(timestamp.lt."2026-10-19T10:00:00",and(timestamp.eq."2026-10-19T10:00:00",id.lt."RPT-ABCD1234"))' in params
+    assert "order=timestamp.desc,id.desc" in params
+    assert "limit=5" in params
+    assert "contact_email" not in params
+
+
+def test_requires_token(client):
+    assert client.get("/api/reports").status_code == 401
+    assert client.get("/api/reports", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+@pytest.mark.parametrize("params", [
+    {"limit": "0"},
+    {"limit": "abc"},
+    {"limit": str(satya.REPORTS_MAX_LIMIT + 1)},
+    {"cursor": "not-a-cursor"},
+    {"since": "yesterday"},
+])
+def test_rejects_invalid_parameters(client, params):
+    response = get_reports(client, **params)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_pagination_returns_each_row_once_in_order(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        response = get_reports(client, **params)
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = read_ndjson(response)
+        seen.extend(lines[:-1])
+        cursor = lines[-1]["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == REPORTS
+
+
+def test_first_batch_failure_returns_500(client, monkeypatch):
+    monkeypatch.setattr(satya, "query_reports", lambda filters, after=None, limit=100: None)
+    response = get_reports(client)
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "Failed to fetch reports"}
+
+
+def test_later_batch_failure_is_reported_in_band(client, monkeypatch):
+    calls = []
+
+    def failing_query_reports(filters, after=None, limit=100):
+        calls.append(after)
+        return fake_query_reports(filters, after, limit) if len(calls) == 1 else None
+
+    monkeypatch.setattr(satya, "query_reports", failing_query_reports)
+    response = get_reports(client, limit=10)
+    assert response.status_code == 200
+    lines = read_ndjson(response)
+    assert lines[:-1] == REPORTS[:4]
+    assert lines[-1] == {"error": "Failed to fetch reports"}
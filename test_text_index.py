@@ -0,0 +1,105 @@
+from text_index import TextIndex, normalize_text, extract_contacts, extract_domains, simhash
+
+SCAM = "Dear Rahul, your SBI account will be blocked today. Update KYC at http://sbi-kyc.xyz/abc or call +91 98765 43210. Pay Rs 500 now."
+SCAM_VARIANT = "Dear Priya Sharma, your SBI account will be blocked today!! Update KYC at http://sbi-kyc.xyz/q9 or call 080-2345-6789. Pay Rs 1200 now."
+UNRELATED = "Hi mom, I will be home late for dinner tonight, traffic is really bad on the highway."
+GENUINE = "Your parcel is held. Track at https://indiapost.gov.in/track?id=1"
+GENUINE_SPOOF = "Your parcel is held. Track at http://indiapost-help.top/x"
+SBI_ALERT = "Your SBI Card statement is ready. For queries call SBI Card helpline 1860 180 1290."
+
+
+def test_normalize_masks_entities():
+    assert normalize_text(SCAM) == normalize_text(SCAM_VARIANT)
+    assert "<name>" in normalize_text(SCAM)
+    assert "<phone>" in normalize_text(SCAM)
+    assert "<amount>" in normalize_text(SCAM)
+
+
+def test_normalize_keeps_lowercase_words_after_greeting():
+    assert normalize_text("Dear customer your account is blocked") == "dear customer your account is blocked"
+    assert normalize_text("Hi there, click this link") == "hi there click this link"
+
+
+def test_normalize_keeps_registrable_domain():
+    assert extract_domains(GENUINE) == ("indiapost.gov.in",)
+    assert extract_domains("Visit https://www.example.co.uk/path") == ("example.co.uk",)
+    assert normalize_text(GENUINE) != normalize_text(GENUINE_SPOOF)
+
+
+def test_normalize_masks_emails_before_links():
+    assert normalize_text("Write to support@sbi.co.in today") == "write to <email> today"
+    assert extract_domains("Write to support@sbi.co.in today") == ()
+    assert extract_contacts("Write to Support@sbi.co.in today")[2] == ("support@sbi.co.in",)
+
+
+def test_link_trailing_punctuation_is_ignored():
+    assert extract_domains("Update KYC at sbi-kyc.xyz, now") == ("sbi-kyc.xyz",)
+    assert extract_domains("Update KYC at (http://sbi-kyc.xyz/a).") == ("sbi-kyc.xyz",)
+    assert normalize_text("Update KYC at sbi-kyc.xyz, now") == normalize_text("Update KYC at sbi-kyc.xyz now")
+
+
+def test_ip_hosts_are_kept_whole():
+    assert extract_domains("Login at http://192.168.0.1/bank now") == ("192.168.0.1",)
+    assert extract_domains("Login at http://10.0.0.1/bank now") != extract_domains("Login at http://192.168.0.1/bank now")
+
+
+def test_short_texts_are_not_fingerprinted():
+    index = TextIndex()
+    assert simhash("   !!! ") is None
+    assert index.add("", {"verdict": "Scam"}) is None
+    assert index.lookup("   !!! ") is None
+    assert len(index) == 0
+
+
+def test_lookup_finds_match_within_distance():
+    index = TextIndex(max_distance=3)
+    index.add(SCAM, {"verdict": "Scam"}, "details")
+    match = index.lookup(SCAM_VARIANT)
+    assert match is not None
+    assert match.distance <= 3
+    assert match.result == {"verdict": "Scam"}
+    assert match.detailed_explanation == "details"
+
+
+def test_lookup_rejects_beyond_distance():
+    index = TextIndex(max_distance=3)
+    index.add(SCAM, {"verdict": "Scam"})
+    assert index.lookup(UNRELATED) is None
+
+
+def test_lookup_rejects_different_link_domain():
+    index = TextIndex(max_distance=63)
+    index.add(GENUINE, {"verdict": "Genuine"})
+    assert index.lookup(GENUINE_SPOOF) is None
+    assert index.lookup(GENUINE.replace("id=1", "id=2")) is not None
+
+
+def test_verdicts_are_deduplicated_and_capacity_is_bounded():
+    index = TextIndex(capacity=2)
+    index.add(SCAM, {"verdict": "Scam"})
+    index.add(SCAM_VARIANT, {"verdict": "Scam"})
+    assert len(index.verdicts) == 1
+    index.add(UNRELATED, {"verdict": "Genuine"})
+    assert len(index) == 2
+    assert len(index.verdicts) == 2
+    assert index.lookup(UNRELATED).result == {"verdict": "Genuine"}
+
+
+def test_genuine_verdict_not_reused_with_different_phone():
+    index = TextIndex()
+    index.add(SBI_ALERT, {"verdict": "Genuine"})
+    assert index.lookup(SBI_ALERT.replace("1860 180 1290", "98300 11223")) is None
+    assert index.lookup(SBI_ALERT).result == {"verdict": "Genuine"}
+
+
+def test_genuine_verdict_not_reused_with_different_email():
+    text = "Your SBI Card statement is ready. For queries write to support@sbi.co.in today."
+    index = TextIndex()
+    index.add(text, {"verdict": "Genuine"})
+    assert index.lookup(text.replace("support@sbi.co.in", "sbi.help@gmail.com")) is None
+
+
+def test_scam_verdict_reused_with_different_phone():
+    index = TextIndex()
+    index.add(SBI_ALERT, {"verdict": "Scam"})
+    assert index.lookup(SBI_ALERT.replace("1860 180 1290", "98300 11223")).result == {"verdict": "Scam"}
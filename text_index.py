@@ -0,0 +1,274 @@
+import re
+import json
+import hashlib
+import threading
+from array import array
+
+# --- Normalization ---
+# Scam templates are reused with different names, phone numbers, amounts and
+# tracking links. These are masked out so that mutations of the same template
+# normalize to the same text. The registrable domain of each link is kept,
+# since it is often the only difference between a real message and a scam.
+# Emails are masked before links so their domain is not read as a link.
+NAME_PATTERN = re.compile(r"\b((?i:dear|hi|hello|hey|mr|mrs|ms|dr))\.?\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?")
+URL_PATTERN = re.compile(r"(https?://\S+|www\.\S+|\b[a-z0-9-]+\.(?:com|in|net|org|co|xyz|info|top|link|ly)\b\S*)")
+EMAIL_PATTERN = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+AMOUNT_PATTERN = re.compile(r"(?:₹|rs\.?|inr|\$|usd|€|£)\s*\d[\d,]*(?:\.\d+)?|\d[\d,]*(?:\.\d+)?\s*(?:rs|inr|rupees|usd|dollars)\b")
+NUMBER_PATTERN = re.compile(r"\b\d+\b")
+IP_PATTERN = re.compile(r"\d{1,3}(?:\.\d{1,3}){3}")
+URL_TRAILING_PUNCTUATION = ".,;:!?)"
+TOKEN_PATTERN = re.compile(r"<\w+>|\w+")
+
+# Second-level labels under which the registrable domain has three labels,
+# e.g. indiapost.gov.in or example.co.uk
+SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "gov", "net", "nic", "org", "res"}
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 2
+# Shorter texts give too few features for a meaningful fingerprint
+MIN_TOKENS = 5
+
+
+def registrable_domain(url):
+    """Return the registrable domain of a URL, e.g. indiapost.gov.in."""
+    host = re.sub(r"^[a-z][a-z0-9+.-]*://", "", url.lower().rstrip(URL_TRAILING_PUNCTUATION))
+    host = re.split(r"[/:?#]", host, 1)[0].strip(URL_TRAILING_PUNCTUATION)
+    if IP_PATTERN.fullmatch(host):
+        return host
+    labels = [label for label in host.split(".") if label]
+    if labels and labels[0] == "www":
+        labels = labels[1:]
+    size = 3 if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS else 2
+    return ".".join(labels[-size:])
+
+
+def extract_contacts(text):
+    """
+    Return the contact details of the text as sorted tuples of link domains,
+    phone numbers (digits only) and email addresses.
+    """
+    text = text.lower()
+    emails = set(EMAIL_PATTERN.findall(text))
+    text = EMAIL_PATTERN.sub(" ", text)
+    domains = {registrable_domain(url) for url in URL_PATTERN.findall(text)}
+    text = URL_PATTERN.sub(" ", text)
+    phones = {re.sub(r"\D", "", phone) for phone in PHONE_PATTERN.findall(text)}
+    return tuple(sorted(domains)), tuple(sorted(phones)), tuple(sorted(emails))
+
+
+def extract_domains(text):
+    """Return the sorted registrable domains of all links in the text."""
+    return extract_contacts(text)[0]
+
+
+def is_scam_verdict(result):
+    """Return True if the analysis result has a Scam verdict."""
+    return str(result.get("verdict", "")).strip().lower() == "scam"
+
+
+def normalize_text(text):
+    """Lowercase the text and mask names, links, contact details and numbers."""
+    text = NAME_PATTERN.sub(r"\1 <name>", text).lower()
+    text = EMAIL_PATTERN.sub(" <email> ", text)
+    text = URL_PATTERN.sub(lambda m: " <url> " + registrable_domain(m.group(0)).replace(".", "_") + " ", text)
+    text = PHONE_PATTERN.sub(" <phone> ", text)
+    text = AMOUNT_PATTERN.sub(" <amount> ", text)
+    text = NUMBER_PATTERN.sub(" <num> ", text)
+    return " ".join(TOKEN_PATTERN.findall(text))
+
+
+def simhash(text):
+    """
+    Compute the 64-bit SimHash fingerprint of the normalized text.
+    Returns None if the text has fewer than MIN_TOKENS tokens.
+    """
+    tokens = normalize_text(text).split()
+    if len(tokens) < MIN_TOKENS:
+        return None
+    features = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class InternTable:
+    """Reference-counted table storing each distinct value once under an integer id."""
+
+    def __init__(self):
+        self.values = []
+        self.refs = array("I")
+        self.ids = {}
+        self.free = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def acquire(self, value):
+        value_id = self.ids.get(value)
+        if value_id is None:
+            if self.free:
+                value_id = self.free.pop()
+                self.values[value_id] = value
+            else:
+                value_id = len(self.values)
+                self.values.append(value)
+                self.refs.append(0)
+            self.ids[value] = value_id
+        self.refs[value_id] += 1
+        return value_id
+
+    def release(self, value_id):
+        self.refs[value_id] -= 1
+        if self.refs[value_id] == 0:
+            del self.ids[self.values[value_id]]
+            self.values[value_id] = None
+            self.free.append(value_id)
+
+    def get(self, value_id):
+        return self.values[value_id]
+
+
+class TemplateMatch:
+    """A previously verified message that is a near-duplicate of the query."""
+
+    def __init__(self, result, detailed_explanation, distance):
+        self.result = result
+        self.detailed_explanation = detailed_explanation
+        self.distance = distance
+
+    @property
+    def similarity(self):
+        return 1 - self.distance / FINGERPRINT_BITS
+
+
+class TextIndex:
+    """
+    In-memory SimHash index of previously verified text messages.
+
+    Fingerprints are kept in a flat array of unsigned 64-bit integers. The
+    fingerprint is split into max_distance + 1 bands and each band value maps
+    to an array of row numbers. Two fingerprints within max_distance bits of
+    each other must agree exactly on at least one band, so a lookup only has
+    to compare against the rows sharing a band with the query.
+
+    Verdicts and contact details are interned, so each row only holds two ids.
+    Once capacity rows are stored, the oldest row is overwritten.
+
+    A Scam verdict is reused for any variant whose links point to the same
+    domains. Other verdicts are only reused when the phone numbers and email
+    addresses are identical too, since swapping in a scammer's number is
+    enough to turn a genuine message into a scam.
+    """
+
+    def __init__(self, max_distance=3, capacity=1000000):
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError("max_distance must be between 0 and 63")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.num_bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.num_bands
+        self.band_mask = (1 << self.band_bits) - 1
+        self.fingerprints = array("Q")
+        self.verdict_ids = array("I")
+        self.contact_ids = array("I")
+        self.scam_flags = array("B")
+        self.verdicts = InternTable()
+        self.contacts = InternTable()
+        self.bands = [{} for _ in range(self.num_bands)]
+        self.next_row = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _band_keys(self, fingerprint):
+        return [(fingerprint >> (band * self.band_bits)) & self.band_mask for band in range(self.num_bands)]
+
+    def _evict(self, row):
+        for band, key in enumerate(self._band_keys(self.fingerprints[row])):
+            bucket = self.bands[band][key]
+            bucket.remove(row)
+            if not bucket:
+                del self.bands[band][key]
+        self.verdicts.release(self.verdict_ids[row])
+        self.contacts.release(self.contact_ids[row])
+
+    def add(self, text, result, detailed_explanation=""):
+        """
+        Store the verdict for a verified message. Returns the row number, or
+        None if the text is too short to fingerprint.
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+        verdict = (json.dumps(result, sort_keys=True), detailed_explanation)
+        contacts = extract_contacts(text)
+        is_scam = is_scam_verdict(result)
+        with self.lock:
+            row = self.next_row
+            verdict_id = self.verdicts.acquire(verdict)
+            contact_id = self.contacts.acquire(contacts)
+            if row < len(self.fingerprints):
+                self._evict(row)
+                self.fingerprints[row] = fingerprint
+                self.verdict_ids[row] = verdict_id
+                self.contact_ids[row] = contact_id
+                self.scam_flags[row] = is_scam
+            else:
+                self.fingerprints.append(fingerprint)
+                self.verdict_ids.append(verdict_id)
+                self.contact_ids.append(contact_id)
+                self.scam_flags.append(is_scam)
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                bucket = self.bands[band].get(key)
+                if bucket is None:
+                    bucket = self.bands[band][key] = array("I")
+                bucket.append(row)
+            self.next_row = (row + 1) % self.capacity
+            return row
+
+    def lookup(self, text):
+        """
+        Return the closest TemplateMatch within max_distance whose contact
+        details allow its verdict to be reused, or None.
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+        contacts = extract_contacts(text)
+        best_row, best_distance = None, self.max_distance + 1
+        with self.lock:
+            seen = set()
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                for row in self.bands[band].get(key, ()):
+                    if row in seen:
+                        continue
+                    seen.add(row)
+                    stored = self.contacts.get(self.contact_ids[row])
+                    if stored[0] != contacts[0] or (not self.scam_flags[row] and stored != contacts):
+                        continue
+                    distance = (self.fingerprints[row] ^ fingerprint).bit_count()
+                    if distance < best_distance:
+                        best_row, best_distance = row, distance
+                if best_distance == 0:
+                    break
+            if best_row is None:
+                return None
+            result, detailed_explanation = self.verdicts.get(self.verdict_ids[best_row])
+        return TemplateMatch(json.loads(result), detailed_explanation, best_distance)